@@ -1,11 +1,18 @@
 # streamlit_btc_ui.py
-import time
 import io
+import json
+import logging
+import os
+import time
 import requests
+import numpy as np
 import pandas as pd
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from textwrap import dedent
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Try import ccxt (optional)
 try:
@@ -15,90 +22,402 @@ except Exception:
     ccxt = None
     _HAS_CCXT = False
 
+# Try import orjson (optional) — faster JSON parsing than stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except Exception:
+    orjson = None
+    _json_loads = json.loads
+
+# Try import pyarrow (optional) — faster CSV export than pandas' writer
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    _HAS_PYARROW = True
+except Exception:
+    pa = None
+    pacsv = None
+    _HAS_PYARROW = False
+
+# Try import diskcache (optional) — shares prepared frames across workers and restarts
+try:
+    import diskcache
+except Exception:
+    diskcache = None
+
+# Try import numba (optional) — _rsi_array falls back to NumPy/pandas without it
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+logger = logging.getLogger(__name__)
+
+# ---------- Shared HTTP session (keeps TCP/TLS connections alive across calls) ----------
+@st.cache_resource(show_spinner=False)
+def _http_session():
+    # Cached so the pool outlives reruns; used for CoinGecko only — ccxt exchanges keep
+    # their own sessions (ccxt closes its session when an exchange object is collected)
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip"})
+    session.mount("https://", HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        # Retry throttling/5xx responses, but not read timeouts: a hung request must not
+        # multiply the 20 s timeout before the caller can give up. Retry-After is ignored
+        # for the same reason: a throttled 429 backs off under 2 s in total, then surfaces.
+        max_retries=Retry(total=3, connect=1, read=0, backoff_factor=0.3,
+                          status_forcelist=(429, 500, 502, 503, 504),
+                          respect_retry_after_header=False),
+    ))
+    return session
+
+# ---------- On-disk frame cache (optional, shared across workers and restarts) ----------
+@st.cache_resource(show_spinner=False)
+def _disk_cache():
+    # Opened once per process; reopening the SQLite-backed cache on every rerun is not free
+    if diskcache is None:
+        return None
+    try:
+        return diskcache.Cache(os.path.expanduser("~/.cache/rsi_scanner"), size_limit=int(1e8))
+    except Exception as e:
+        logger.warning("Disk cache unavailable: %r", e)
+        return None
+
 # ---------- Helpers: resilient fetcher (ccxt tries, then CoinGecko) ----------
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _markets_for(exchange_id):
+    # One load_markets() per exchange per hour; the symbol set lets us pick a
+    # listed BTC pair before doing any OHLCV network I/O.
+    ex = getattr(ccxt, exchange_id)({"enableRateLimit": True})
+    ex.timeout = 30000
+    ex.load_markets()
+    return ex, frozenset(ex.symbols) | frozenset(ex.ids)
+
 def fetch_ohlcv_via_ccxt(exchange_id, symbol_variants, timeframe="1h", limit=200):
-    last_exc = None
     if not _HAS_CCXT:
         raise RuntimeError("ccxt not installed")
     if not hasattr(ccxt, exchange_id):
         raise AttributeError(f"ccxt has no exchange named '{exchange_id}'")
-    Exch = getattr(ccxt, exchange_id)
-    ex = Exch({"enableRateLimit": True})
-    ex.timeout = 30000
-    for sym in symbol_variants:
-        try:
-            ohlcv = ex.fetch_ohlcv(sym, timeframe=timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=["timestamp","open","high","low","close","volume"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-            return df
-        except Exception as e:
-            last_exc = e
-            # continue trying others
-            time.sleep(0.15)
-    raise last_exc
+    ex, supported = _markets_for(exchange_id)
+    sym = next((s for s in symbol_variants if s in supported), None)
+    if sym is None:
+        raise RuntimeError(f"{exchange_id} lists none of {list(symbol_variants)}")
+    ohlcv = ex.fetch_ohlcv(sym, timeframe=timeframe, limit=limit)
+    # Typed columns straight from the raw rows instead of an object-dtype frame
+    arr = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+    df = pd.DataFrame(arr[:, 1:], columns=["open","high","low","close","volume"])
+    df.insert(0, "timestamp", pd.to_datetime(arr[:, 0].astype(np.int64), unit="ms"))
+    return df
+
+# Exchange universe and per-exchange BTC symbol spellings. The literals are re-evaluated on
+# each rerun (cheap); the ccxt id set is built once per process in _ccxt_exchanges()
+DEFAULT_EXCHANGES = (
+    "kraken", "bitstamp", "bitfinex", "coinbasepro", "coinbase", "gemini",
+    "huobipro", "okx", "kucoin", "gate", "mexc", "whitebit"
+)
+_DEFAULT_BTC_VARIANTS = ("BTC/USDT", "BTC/USD", "BTC/USDT:USDT", "BTC/USDT:USD")
+_BTC_VARIANTS = {
+    "coinbasepro": ("BTC/USD", "BTC-USD", "BTC/USDT"),
+    "coinbase": ("BTC/USD", "BTC-USD", "BTC/USDT"),
+    "gemini": ("BTC/USD", "BTC-USD", "BTC/USDT"),
+    "kraken": ("BTC/USD", "XBT/USD", "BTC/USDT"),
+    "bitfinex": ("BTC/USD", "BTC/USDT", "tBTCUSD"),
+}
+
+@st.cache_resource(show_spinner=False)
+def _ccxt_exchanges():
+    return frozenset(ccxt.exchanges) if _HAS_CCXT else frozenset()
+
+def _btc_symbol_variants(exch):
+    return _BTC_VARIANTS.get(exch, _DEFAULT_BTC_VARIANTS)
+
+def _log_exchange_failure(exch, exc):
+    # repr only on the hot path; full traceback just when debug logging is on
+    logger.warning("Exchange %s failed: %r", exch, exc, exc_info=logger.isEnabledFor(logging.DEBUG))
+
+def _race_exchanges(exchanges, timeframe, limit):
+    # Query all exchanges at once and take the first that answers; stragglers are
+    # left to finish in the background instead of being waited on.
+    pool = ThreadPoolExecutor(max_workers=len(exchanges))
+    try:
+        futs = {
+            pool.submit(fetch_ohlcv_via_ccxt, exch, _btc_symbol_variants(exch), timeframe, limit): exch
+            for exch in exchanges
+        }
+        for fut in as_completed(futs):
+            exch = futs[fut]
+            try:
+                return fut.result(), exch
+            except Exception as e:
+                _log_exchange_failure(exch, e)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return None, None
+
+@st.cache_resource(show_spinner=False)
+def _exchange_state():
+    # Module globals are reset on every Streamlit rerun; this holder survives them.
+    # "last_good" is the last exchange that answered, probed first next time.
+    return {"last_good": None}
 
 def fetch_btc_ohlcv_resilient(timeframe="1h", limit=200, try_exchanges=None):
+    state = _exchange_state()
     if try_exchanges is None:
-        try_exchanges = [
-            "kraken", "bitstamp", "bitfinex", "coinbasepro", "coinbase", "gemini",
-            "huobipro", "okx", "kucoin", "gate", "mexc", "whitebit"
-        ]
-    common_variants = ["BTC/USDT", "BTC/USD", "BTC/USDT:USDT", "BTC/USDT:USD"]
+        try_exchanges = DEFAULT_EXCHANGES
     if _HAS_CCXT:
-        for exch in try_exchanges:
+        supported = _ccxt_exchanges()
+        candidates = [e for e in try_exchanges if e in supported]
+        if state["last_good"] in candidates:
+            exch = state["last_good"]
+            candidates.remove(exch)
             try:
-                if not hasattr(ccxt, exch):
-                    continue
-                variants = common_variants.copy()
-                if exch in ("coinbasepro", "coinbase", "gemini"):
-                    variants = ["BTC/USD", "BTC-USD", "BTC/USDT"]
-                if exch == "kraken":
-                    variants = ["BTC/USD", "XBT/USD", "BTC/USDT"]
-                if exch == "bitfinex":
-                    variants = ["BTC/USD", "BTC/USDT", "tBTCUSD"]
-                df = fetch_ohlcv_via_ccxt(exch, variants, timeframe=timeframe, limit=limit)
+                df = fetch_ohlcv_via_ccxt(exch, _btc_symbol_variants(exch), timeframe=timeframe, limit=limit)
                 return df, f"ccxt:{exch}"
             except Exception as e:
-                # log and continue
-                st.write(f"Exchange {exch} failed: {repr(e)}")
-                continue
+                _log_exchange_failure(exch, e)
+                # Forget it so a dead exchange is not waited on serially again next fetch
+                state["last_good"] = None
+        if candidates:
+            df, exch = _race_exchanges(candidates, timeframe, limit)
+            if df is not None:
+                state["last_good"] = exch
+                return df, f"ccxt:{exch}"
     # Fallback to CoinGecko
     df = fetch_btc_ohlcv_coingecko(timeframe=timeframe, limit=limit)
     return df, "coingecko"
 
-def fetch_btc_ohlcv_coingecko(timeframe="1h", limit=200, days=7):
+def fetch_btc_ohlcv_coingecko(timeframe="1h", limit=200, days=None):
     tf_to_mins = {"1m":1, "5m":5, "15m":15, "30m":30, "1h":60, "4h":240, "1d":1440}
     if timeframe not in tf_to_mins:
         raise ValueError("Unsupported timeframe for CoinGecko fallback")
     minutes = tf_to_mins[timeframe]
+    if days is None:
+        # CoinGecko returns 5-minute prices for 1 day, hourly for 2-90 days and daily beyond.
+        # Sub-hour bars need the 5-minute data, so they get 1 day; otherwise only as many days
+        # as `limit` candles span, capped at 90 so the bins stay real OHLC
+        if minutes < 60:
+            days = 1
+        else:
+            days = min(90, max(1, -(-limit * minutes // 1440)))
     url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
     params = {"vs_currency":"usd", "days": days}
-    r = requests.get(url, params=params, timeout=20)
+    r = _http_session().get(url, params=params, timeout=20)
     r.raise_for_status()
-    js = r.json()
+    js = _json_loads(r.content)
     prices = js.get("prices", [])
     if not prices:
         raise RuntimeError("CoinGecko returned no prices")
-    pdf = pd.DataFrame(prices, columns=["timestamp_ms","price"])
-    pdf["timestamp"] = pd.to_datetime(pdf["timestamp_ms"], unit="ms")
-    pdf = pdf.set_index("timestamp").drop(columns=["timestamp_ms"])
-    ohlc = pdf["price"].resample(f"{minutes}T").ohlc().dropna()
+    # [[ts_ms, price], ...] -> two typed columns, no intermediate object frame
+    arr = np.asarray(prices, dtype=np.float64)
+    ohlc = _bin_ohlc(arr[:, 0].astype(np.int64), arr[:, 1], minutes * 60_000)
     ohlc["volume"] = None
-    ohlc = ohlc.reset_index().rename(columns={"open":"open","high":"high","low":"low","close":"close"})
     if len(ohlc) > limit:
         ohlc = ohlc.tail(limit).reset_index(drop=True)
     return ohlc
 
+def _bin_ohlc(ts_ms, px, step_ms):
+    # Epoch-aligned OHLC bins in one NumPy pass (same buckets as resample().ohlc().dropna())
+    if np.any(ts_ms[1:] < ts_ms[:-1]):
+        order = np.argsort(ts_ms, kind="stable")
+        ts_ms, px = ts_ms[order], px[order]
+    bins = ts_ms // step_ms
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    ends = np.r_[starts[1:], len(px)] - 1
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(bins[starts] * step_ms, unit="ms"),
+        "open": px[starts],
+        "high": np.maximum.reduceat(px, starts),
+        "low": np.minimum.reduceat(px, starts),
+        "close": px[ends],
+    })
+
 # ---------- Small RSI util ----------
-def compute_rsi(series, period=14):
-    delta = series.diff()
-    up = delta.clip(lower=0)
-    down = -1 * delta.clip(upper=0)
-    ma_up = up.ewm(com=(period - 1), adjust=False).mean()
-    ma_down = down.ewm(com=(period - 1), adjust=False).mean()
-    rs = ma_up / ma_down
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+@njit(cache=True)
+def _rsi_from_averages(avg_up, avg_dn):
+    # A flat window (no moves either way) has no defined RSI; only pure gains give 100
+    if avg_dn == 0:
+        return np.nan if avg_up == 0 else 100.0
+    return 100.0 - 100.0 / (1.0 + avg_up / avg_dn)
+
+# fastmath without "nnan": the kernel deliberately writes NaN for warm-up and flat windows
+@njit(cache=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"})
+def _rsi_wilder(close, period):
+    # Wilder smoothing, seeded with the simple mean of the first `period` moves
+    n = close.shape[0]
+    out = np.empty_like(close)
+    out[:] = np.nan
+    if n <= period:
+        return out
+    avg_up = 0.0
+    avg_dn = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            avg_up += d
+        else:
+            avg_dn -= d
+    avg_up /= period
+    avg_dn /= period
+    out[period] = _rsi_from_averages(avg_up, avg_dn)
+    for i in range(period + 1, n):
+        d = close[i] - close[i - 1]
+        u = d if d > 0 else 0.0
+        dn = -d if d < 0 else 0.0
+        avg_up = (avg_up * (period - 1) + u) / period
+        avg_dn = (avg_dn * (period - 1) + dn) / period
+        out[i] = _rsi_from_averages(avg_up, avg_dn)
+    return out
+
+def _rsi_wilder_np(close, period):
+    # Same result as _rsi_wilder without a Python-level loop, for when numba is missing
+    out = np.full(close.shape, np.nan, dtype=close.dtype)
+    if close.shape[0] <= period:
+        return out
+    delta = np.diff(close.astype(np.float64))
+    up = np.maximum(delta, 0.0)
+    dn = np.maximum(-delta, 0.0)
+    up[period - 1] = up[:period].mean()
+    dn[period - 1] = dn[:period].mean()
+    avg_up = pd.Series(up[period - 1:]).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+    avg_dn = pd.Series(dn[period - 1:]).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_dn))
+    rsi[(avg_up == 0) & (avg_dn == 0)] = np.nan
+    out[period:] = rsi
+    return out
+
+def _rsi_array(close, period=14):
+    return _rsi_wilder(close, period) if _HAS_NUMBA else _rsi_wilder_np(close, period)
+
+# ---------- Prepared frame (fetch + normalize + RSI), cached together ----------
+FRAME_TTL = 60
+
+@st.cache_data(ttl=FRAME_TTL, show_spinner=False)
+def load_btc_frame(timeframe, limit):
+    # Returns (df, source, fetched_at). The in-memory TTL restarts on a disk hit, so the
+    # fetch time travels with the frame and the UI can report the data's real age.
+    cache = _disk_cache()
+    key = ("btc_frame", timeframe, limit)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    df, source = _prepare_btc_frame(timeframe, limit)
+    fetched_at = time.time()
+    if cache is not None:
+        cache.set(key, (df, source, fetched_at), expire=FRAME_TTL)
+    return df, source, fetched_at
+
+def _prepare_btc_frame(timeframe, limit):
+    df, source = fetch_btc_ohlcv_resilient(timeframe=timeframe, limit=limit, try_exchanges=None)
+    # normalize columns: coinGecko returns lowercase timestamps for index -> ensure 'timestamp' col
+    if "timestamp" in df.columns:
+        df = df.rename(columns={"timestamp": "open_time"})
+    if "open_time" not in df.columns:
+        # try to detect time col
+        possible_time_cols = [c for c in df.columns if "time" in c.lower() or c.lower() == "timestamp"]
+        if possible_time_cols:
+            df = df.rename(columns={possible_time_cols[0]: "open_time"})
+    open_time = pd.to_datetime(df["open_time"]).to_numpy()
+    order = np.argsort(open_time, kind="stable")
+    # Build the final frame in one constructor call from sorted, typed arrays: only the
+    # columns the table, charts and CSV use. Prices/volume stay float64 so the table and CSV
+    # export are exact; float32 is used only for the RSI kernel (and its output) and the charts.
+    cols = {"open_time": open_time[order]}
+    for c in ["open","high","low","close","volume"]:
+        if c in df.columns:
+            cols[c] = df[c].to_numpy(dtype=np.float64)[order]
+    cols["rsi"] = _rsi_array(cols["close"].astype(np.float32))
+    df = pd.DataFrame(cols)
+    return df, source
+
+# ---------- Charts ----------
+MAX_CHART_POINTS = 1000
+# Constant parts of the chart layouts, shared by every build_figures call (cheap literals,
+# re-evaluated on each rerun; build_figures merges per-figure keys into a copy)
+OHLC_LAYOUT = dict(xaxis=dict(rangeslider=dict(visible=False)), height=600)
+RSI_LAYOUT = dict(height=200, margin=dict(t=10,b=10,l=40,r=40))
+
+def _downsample_ohlc(df, max_points):
+    # Merge runs of k consecutive candles (first open, max high, min low, last close) so the
+    # browser never draws more than max_points bars; the newest bucket is always complete.
+    # Chart arrays are float32: plenty for drawing and half the payload of the float64 frame.
+    # Returns (frame, k); RSI keeps each bucket's last value, plotted at that bar's own time.
+    n = len(df)
+    if n == 0:
+        return df.assign(rsi_time=df["open_time"]), 1
+    k = max(1, -(-n // max_points))
+    starts = np.arange(n % k, n, k)
+    if starts[0]:
+        starts = np.r_[0, starts]
+    ends = np.r_[starts[1:], n] - 1
+    return pd.DataFrame({
+        "open_time": df["open_time"].to_numpy()[starts],
+        "open": df["open"].to_numpy(dtype=np.float32)[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(dtype=np.float32), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(dtype=np.float32), starts),
+        "close": df["close"].to_numpy(dtype=np.float32)[ends],
+        "rsi": df["rsi"].to_numpy(dtype=np.float32)[ends],
+        "rsi_time": df["open_time"].to_numpy()[ends],
+    }), k
+
+def _frame_fingerprint(df):
+    # Row count + last bar is enough to tell candle frames apart without hashing every cell
+    if df.empty:
+        return (0,)
+    return (len(df), df["open_time"].iloc[-1].value, float(df["close"].iloc[-1]), float(df["rsi"].iloc[-1]))
+
+@st.cache_data(ttl=60, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def build_figures(df, timeframe, source):
+    # Returned as plain dicts so the cached value is cheap to copy; st.plotly_chart accepts them as-is
+    import plotly.graph_objects as go
+    df, k = _downsample_ohlc(df, MAX_CHART_POINTS)
+    title = f"BTC — {timeframe} — source: {source}"
+    if k > 1:
+        title += f" — {k} candles merged per bar"
+    # Zoom/pan survive redraws of the same series, but reset when timeframe or source changes
+    uirevision = f"{timeframe}|{source}"
+    # Traces and layout passed to the constructor: one validation pass per figure
+    fig = go.Figure(
+        data=[go.Candlestick(
+            x=df["open_time"],
+            open=df["open"],
+            high=df["high"],
+            low=df["low"],
+            close=df["close"],
+            name="OHLC"
+        )],
+        layout=dict(OHLC_LAYOUT, title=title, uirevision=uirevision),
+    )
+    rsi_fig = go.Figure(
+        data=[go.Scattergl(x=df["rsi_time"], y=df["rsi"], name="RSI")],
+        layout=dict(RSI_LAYOUT, uirevision=uirevision),
+    )
+    return fig.to_dict(), rsi_fig.to_dict()
+
+# ---------- CSV export ----------
+def frame_to_csv_bytes(df):
+    if _HAS_PYARROW:
+        # Match pandas' output: unquoted header, timestamps without fractional seconds
+        dt_cols = df.select_dtypes(include=["datetime", "datetimetz"]).columns
+        if len(dt_cols):
+            df = df.assign(**{c: df[c].astype(str) for c in dt_cols})
+        buf = pa.BufferOutputStream()
+        buf.write((",".join(map(str, df.columns)) + "\n").encode())
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf,
+                        write_options=pacsv.WriteOptions(include_header=False, quoting_style="none"))
+        return buf.getvalue().to_pybytes()
+    csv_buf = io.StringIO()
+    df.to_csv(csv_buf, index=False)
+    return csv_buf.getvalue().encode()
 
 # ---------- Streamlit UI ----------
 st.set_page_config(page_title="BTC OHLC Viewer", layout="wide")
@@ -108,13 +427,22 @@ with st.sidebar:
     st.header("Fetch settings")
     timeframe = st.selectbox("Timeframe", ["1m","5m","15m","30m","1h","4h","1d"], index=4)
     limit = st.number_input("Candles (limit)", min_value=10, max_value=2000, value=200, step=10)
-    days = st.number_input("CoinGecko days (for fallback)", min_value=1, max_value=365, value=7)
     st.markdown("---")
     st.write("Optional: enable ccxt (if installed) to try exchange-accurate candles.")
     if _HAS_CCXT:
         st.success("ccxt is available")
     else:
         st.warning("ccxt not installed — app will use CoinGecko fallback only")
+    st.markdown("---")
+    if _disk_cache() is not None:
+        st.caption(f"Fetched candles are cached for up to {2 * FRAME_TTL} s "
+                   f"({FRAME_TTL} s on disk, then {FRAME_TTL} s in memory).")
+    else:
+        st.caption(f"Fetched candles are cached for {FRAME_TTL} s.")
+    if st.button("Clear cached data"):
+        st.cache_data.clear()
+        if _disk_cache() is not None:
+            _disk_cache().clear()
 
 col1, col2 = st.columns([3,1])
 
@@ -123,50 +451,21 @@ with col1:
     if st.button("Fetch BTC data"):
         with st.spinner("Fetching data..."):
             try:
-                df, source = fetch_btc_ohlcv_resilient(timeframe=timeframe, limit=limit, try_exchanges=None)
-                st.success(f"Data source: {source}")
-                # normalize columns: coinGecko returns lowercase timestamps for index -> ensure 'timestamp' col
-                if "timestamp" in df.columns:
-                    df = df.rename(columns={"timestamp": "open_time"})
-                if "open_time" not in df.columns:
-                    # try to detect time col
-                    possible_time_cols = [c for c in df.columns if "time" in c.lower() or c.lower() == "timestamp"]
-                    if possible_time_cols:
-                        df = df.rename(columns={possible_time_cols[0]: "open_time"})
-                df["open_time"] = pd.to_datetime(df["open_time"])
-                df = df.sort_values("open_time").reset_index(drop=True)
-                # Ensure numeric types
-                for c in ["open","high","low","close","volume"]:
-                    if c in df.columns:
-                        df[c] = pd.to_numeric(df[c], errors="coerce")
+                df, source, fetched_at = load_btc_frame(timeframe, limit)
+                st.success(f"Data source: {source} — fetched {time.time() - fetched_at:.0f} s ago")
                 # Show table
                 st.dataframe(df.tail(100))
                 # Plot candlestick + RSI using Plotly
                 try:
-                    import plotly.graph_objects as go
-                    fig = go.Figure()
-                    fig.add_trace(go.Candlestick(
-                        x=df["open_time"],
-                        open=df["open"],
-                        high=df["high"],
-                        low=df["low"],
-                        close=df["close"],
-                        name="OHLC"
-                    ))
-                    # Compute RSI
-                    df["rsi"] = compute_rsi(df["close"].astype(float))
-                    rsi_fig = go.Figure()
-                    rsi_fig.add_trace(go.Scatter(x=df["open_time"], y=df["rsi"], name="RSI"))
-                    rsi_fig.update_layout(height=200, margin=dict(t=10,b=10,l=40,r=40))
-                    fig.update_layout(title=f"BTC — {timeframe} — source: {source}", xaxis_rangeslider_visible=False, height=600)
-                    st.plotly_chart(fig, use_container_width=True)
-                    st.plotly_chart(rsi_fig, use_container_width=True)
+                    fig, rsi_fig = build_figures(df, timeframe, source)
+                    # Stable keys pin each chart's element identity across reruns; zoom/pan
+                    # preservation comes from the figures' uirevision, not from the key
+                    st.plotly_chart(fig, use_container_width=True, key="ohlc_chart")
+                    st.plotly_chart(rsi_fig, use_container_width=True, key="rsi_chart")
                 except Exception as e:
                     st.error(f"Plotly chart failed: {e}")
                 # CSV download
-                csv_buf = io.StringIO()
-                df.to_csv(csv_buf, index=False)
-                csv_bytes = csv_buf.getvalue().encode()
+                csv_bytes = frame_to_csv_bytes(df)
                 st.download_button("Download CSV", data=csv_bytes, file_name=f"BTC_{timeframe}_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.csv")
             except Exception as e:
                 st.error(f"Failed to fetch data: {e}")